@@ -7,7 +7,7 @@ def create_file(path, content):
     # Ensure directory exists
     os.makedirs(os.path.dirname(path), exist_ok=True)
     with open(path, 'w', encoding='utf-8') as f:
-        f.write(content.strip())
+        f.write(content.strip() + '\n')
     print(f"Created: {path}")
 
 def main():
@@ -97,6 +97,21 @@ def main():
         </div>
     </div>
 {% endblock %}
+"""
+
+    # Custom 404 page (served by server.py for unknown URLs)
+    not_found_html = """
+{% extends 'base.html' %}
+
+{% block title %}Page Not Found{% endblock %}
+
+{% block content %}
+    <div class="max-w-2xl mx-auto text-center py-16">
+        <h1 class="text-6xl font-extrabold mb-4 text-primary">404</h1>
+        <p class="text-xl mb-8">Sorry, we couldn't find that page.</p>
+        <a href="/" class="text-primary hover:underline">&larr; Back Home</a>
+    </div>
+{% endblock %}
 """
 
     # ---------------------------------------------------------
@@ -194,6 +209,12 @@ html { scroll-behavior: smooth; }
 
     requirements_txt = "jinja2"
 
+    # Redirects compiled into routes.json by build.py
+    redirects_txt = """
+# <from> <to> [status]   (status 300-399, defaults to 301)
+/home /
+"""
+
     setup_env_sh = """
 #!/bin/bash
 set -e
@@ -211,6 +232,7 @@ echo "✅ Setup complete! Run 'bash manage.sh' next."
 #!/bin/bash
 
 PID_FILE=".server_pid"
+PORT_FILE=".server_port"
 LOG_FILE="server.log"
 
 show_menu() {
@@ -220,8 +242,9 @@ show_menu() {
     echo "1. Stop the site"
     echo "2. Build & Run the site (Custom Port)"
     echo "3. Quick Restart (Port 8000 - Testing)"
-    echo "4. Exit"
-    echo -n "Select an option [1-4]: "
+    echo "4. Status & Metrics"
+    echo "5. Exit"
+    echo -n "Select an option [1-5]: "
 }
 
 stop_site() {
@@ -230,11 +253,11 @@ stop_site() {
         if ps -p $PID > /dev/null 2>&1; then
             echo "Stopping server with PID: $PID..."
             kill $PID
-            rm "$PID_FILE"
+            rm -f "$PID_FILE" "$PORT_FILE"
             echo "✅ Site stopped."
         else
             echo "⚠️  Stale PID file found. Cleaning up."
-            rm "$PID_FILE"
+            rm -f "$PID_FILE" "$PORT_FILE"
         fi
     else
         echo "⚠️  No active server found."
@@ -254,9 +277,21 @@ start_server() {
     python build.py
 
     echo "🚀 Launching on port $PORT..."
-    nohup python3 -m http.server $PORT --directory . > "$LOG_FILE" 2>&1 &
+    nohup python3 server.py $PORT > "$LOG_FILE" 2>&1 &
     echo $! > "$PID_FILE"
+    echo $PORT > "$PORT_FILE"
     echo "✅ Live at: http://localhost:$PORT"
+    echo "   Access log: access.log (rotated to access.log.1..5)"
+}
+
+show_status() {
+    if [ ! -f "$PID_FILE" ] || ! ps -p $(cat "$PID_FILE") > /dev/null 2>&1; then
+        echo "⚠️  No active server found."
+        return
+    fi
+    PORT=$(cat "$PORT_FILE" 2>/dev/null || echo 8000)
+    echo "✅ Running (PID: $(cat "$PID_FILE"), port $PORT)"
+    curl -s "http://127.0.0.1:$PORT/metrics" | grep -v -e '^#' -e '_bucket' || echo "❌ Could not reach /metrics"
 }
 
 show_menu
@@ -275,30 +310,955 @@ case $OPTION in
         stop_site
         start_server 8000
         ;;
-    4) exit 0 ;;
+    4) show_status ;;
+    5) exit 0 ;;
     *) echo "Invalid option." ;;
 esac
 """
 
+    server_py = """
+import os
+import sys
+import json
+import time
+import bisect
+import signal
+import itertools
+import threading
+from collections import deque
+from urllib.parse import unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROUTES_FILE = os.path.join(ROOT_DIR, 'routes.json')
+CACHE_MAX_FILE = 256 * 1024  # Files up to this size are kept in memory after first read
+
+ACCESS_LOG_FILE = os.path.join(ROOT_DIR, 'access.log')
+ACCESS_LOG_QUEUE = 10000               # Records buffered before new ones are dropped
+ACCESS_LOG_FLUSH_SECS = 0.5            # How often the writer drains the queue
+ACCESS_LOG_MAX_BYTES = 10 * 1024 * 1024
+ACCESS_LOG_ROTATE_SECS = 24 * 60 * 60
+ACCESS_LOG_BACKUPS = 5
+
+METRICS_PATH = '/metrics'              # Only answered for loopback clients
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+ROUTE_CLASSES = ('page', 'static', 'not_modified', 'redirect', 'error')
+
+with open(ROUTES_FILE, encoding='utf-8') as f:
+    _table = json.load(f)
+ROUTES = _table['routes']
+NOT_FOUND = _table['not_found'] or [404, None, 'text/plain; charset=utf-8', None, None]
+BODY_CACHE = {}
+
+def read_body(rel_path, stats):
+    if rel_path is None:
+        return b'404 Not Found'
+    body = BODY_CACHE.get(rel_path)
+    if body is None:
+        stats.cache_misses += 1
+        with open(os.path.join(ROOT_DIR, rel_path), 'rb') as f:
+            body = f.read()
+        if len(body) <= CACHE_MAX_FILE:
+            BODY_CACHE[rel_path] = body
+    else:
+        stats.cache_hits += 1
+    return body
+
+class Stats:
+    # Counters for one connection. Only the thread serving that connection
+    # writes to it, so updating them needs no lock.
+    def __init__(self):
+        self.requests = dict.fromkeys(ROUTE_CLASSES, 0)
+        self.seconds = dict.fromkeys(ROUTE_CLASSES, 0.0)
+        self.buckets = {name: [0] * (len(LATENCY_BUCKETS) + 1) for name in ROUTE_CLASSES}
+        self.bytes_sent = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def observe(self, route_class, duration, sent):
+        self.requests[route_class] += 1
+        self.seconds[route_class] += duration
+        self.buckets[route_class][bisect.bisect_left(LATENCY_BUCKETS, duration)] += 1
+        self.bytes_sent += sent
+
+    def add(self, other):
+        for name in ROUTE_CLASSES:
+            self.requests[name] += other.requests[name]
+            self.seconds[name] += other.seconds[name]
+            self.buckets[name] = [a + b for a, b in zip(self.buckets[name], other.buckets[name])]
+        self.bytes_sent += other.bytes_sent
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+
+class Metrics:
+    # Live connections register their Stats on open and fold them into the
+    # totals on close; the lock is taken once per connection, never per request.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.closed = Stats()
+        self.live = set()
+        self.started = time.time()
+
+    def open(self, stats):
+        with self.lock:
+            self.live.add(stats)
+
+    def close(self, stats):
+        with self.lock:
+            self.live.discard(stats)
+            self.closed.add(stats)
+
+    def render(self):
+        total = Stats()
+        with self.lock:
+            total.add(self.closed)
+            live = list(self.live)
+        for stats in live:
+            total.add(stats)
+        lines = [
+            '# HELP pysite_requests_total Requests served, by route class.',
+            '# TYPE pysite_requests_total counter',
+        ]
+        for name in ROUTE_CLASSES:
+            lines.append(f'pysite_requests_total{{class="{name}"}} {total.requests[name]}')
+        lines += [
+            '# HELP pysite_request_duration_seconds Time to resolve and send a response.',
+            '# TYPE pysite_request_duration_seconds histogram',
+        ]
+        for name in ROUTE_CLASSES:
+            count = 0
+            for bound, hits in zip(LATENCY_BUCKETS + ('+Inf',), total.buckets[name]):
+                count += hits
+                lines.append(f'pysite_request_duration_seconds_bucket{{class="{name}",le="{bound}"}} {count}')
+            lines.append(f'pysite_request_duration_seconds_sum{{class="{name}"}} {total.seconds[name]:.6f}')
+            lines.append(f'pysite_request_duration_seconds_count{{class="{name}"}} {count}')
+        lookups = total.cache_hits + total.cache_misses
+        lines += [
+            '# TYPE pysite_bytes_sent_total counter',
+            f'pysite_bytes_sent_total {total.bytes_sent}',
+            '# TYPE pysite_open_connections gauge',
+            f'pysite_open_connections {len(live)}',
+            '# TYPE pysite_body_cache_hits_total counter',
+            f'pysite_body_cache_hits_total {total.cache_hits}',
+            '# TYPE pysite_body_cache_misses_total counter',
+            f'pysite_body_cache_misses_total {total.cache_misses}',
+            '# TYPE pysite_body_cache_hit_ratio gauge',
+            f'pysite_body_cache_hit_ratio {total.cache_hits / lookups if lookups else 0:.4f}',
+            '# TYPE pysite_body_cache_entries gauge',
+            f'pysite_body_cache_entries {len(BODY_CACHE)}',
+            '# TYPE pysite_uptime_seconds gauge',
+            f'pysite_uptime_seconds {time.time() - self.started:.0f}',
+        ]
+        return ('\\n'.join(lines) + '\\n').encode()
+
+class AccessLog:
+    # Request threads only append a tuple to a bounded deque; a background
+    # thread formats JSON lines, writes them in batches and rotates the file.
+    def __init__(self, path):
+        self.path = path
+        self.queue = deque()
+        self.drops = itertools.count()  # next() is atomic, so request threads never lose a drop
+        self.drops_seen = 0
+        self.lost = 0  # Records from a batch whose write failed, reported with the next drop count
+        self.failing = False
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='access-log', daemon=True)
+
+    def push(self, record):
+        if len(self.queue) < ACCESS_LOG_QUEUE:
+            self.queue.append(record)
+        else:
+            next(self.drops)
+
+    def start(self):
+        self.open()
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+
+    def open(self):
+        self.file = open(self.path, 'ab')
+        self.size = self.file.tell()
+        self.opened = time.time()
+
+    def rotate(self):
+        self.file.close()
+        try:
+            for i in range(ACCESS_LOG_BACKUPS - 1, 0, -1):
+                if os.path.exists(f'{self.path}.{i}'):
+                    os.replace(f'{self.path}.{i}', f'{self.path}.{i + 1}')
+            os.replace(self.path, f'{self.path}.1')
+        finally:
+            self.open()
+
+    def run(self):
+        stopping = False
+        while not stopping:
+            stopping = self.stop_event.wait(ACCESS_LOG_FLUSH_SECS)
+            try:
+                if self.file.closed:
+                    self.open()
+                if self.flush():
+                    self.failing = False
+            except OSError as e:
+                # Keep the writer alive and report once per outage; lost batches are counted as drops
+                if not self.failing:
+                    print(f"Access log write failed, dropping records until it recovers: {e}",
+                          file=sys.stderr, flush=True)
+                    self.failing = True
+        self.file.close()
+
+    def flush(self):
+        lines = []
+        queue = self.queue
+        while queue:
+            ts, ip, method, path, status, sent, duration, agent, referer = queue.popleft()
+            lines.append(json.dumps({
+                'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(ts)) + '.%03dZ' % (ts % 1 * 1000),
+                'ip': ip, 'method': method, 'path': path, 'status': status, 'bytes': sent,
+                'ms': round(duration * 1000, 3), 'ua': agent, 'referer': referer,
+            }))
+        # The writer's own next() advances the count too, hence the + 1
+        total = next(self.drops)
+        dropped, self.drops_seen = total - self.drops_seen + self.lost, total + 1
+        self.lost = 0
+        records = len(lines)
+        if dropped:
+            lines.append(json.dumps({'ts': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'dropped': dropped}))
+        if not lines:
+            return False
+        data = ('\\n'.join(lines) + '\\n').encode('utf-8')
+        try:
+            self.file.write(data)
+            self.file.flush()
+        except OSError:
+            self.lost = records + dropped
+            raise
+        self.size += len(data)
+        if self.size >= ACCESS_LOG_MAX_BYTES or time.time() - self.opened >= ACCESS_LOG_ROTATE_SECS:
+            self.rotate()
+        return True
+
+ACCESS_LOG = AccessLog(ACCESS_LOG_FILE)
+METRICS = Metrics()
+
+class SiteServer(ThreadingHTTPServer):
+    request_queue_size = 128  # Default backlog of 5 drops SYNs under bursts
+
+class RouteHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'PySite'
+    disable_nagle_algorithm = True  # Headers and body are separate writes; avoid delayed-ACK stalls
+
+    def setup(self):
+        super().setup()
+        self.stats = Stats()
+        METRICS.open(self.stats)
+
+    def finish(self):
+        super().finish()
+        METRICS.close(self.stats)
+
+    def do_GET(self, head=False):
+        start = time.perf_counter()
+        path = unquote(self.path.split('?', 1)[0])
+        if path == METRICS_PATH and self.client_address[0] in ('127.0.0.1', '::1'):
+            status, sent = self.send_metrics(head)
+        else:
+            route = ROUTES.get(path, NOT_FOUND)
+            status, sent = self.respond(route, head)
+            if status == 304:
+                route_class = 'not_modified'
+            elif status >= 400:
+                route_class = 'error'
+            elif status >= 300:
+                route_class = 'redirect'
+            elif route[2].startswith('text/html'):
+                route_class = 'page'
+            else:
+                route_class = 'static'
+            self.stats.observe(route_class, time.perf_counter() - start, sent)
+        ACCESS_LOG.push((time.time(), self.client_address[0], self.command, self.path, status, sent,
+                         time.perf_counter() - start, self.headers.get('User-Agent'), self.headers.get('Referer')))
+
+    def do_HEAD(self):
+        self.do_GET(head=True)
+
+    def respond(self, route, head):
+        status = route[0]
+        if 300 <= status < 400:
+            location = route[1]
+            query = self.path.partition('?')[2]
+            if query:
+                # Keep the caller's query string, as http.server does for trailing slashes
+                location += ('&' if '?' in location else '?') + query
+            self.send_response(status)
+            self.send_header('Location', location)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return status, 0
+        _, rel_path, ctype, etag, modified = route
+        if status == 200 and etag and (
+                self.headers.get('If-None-Match') == etag
+                or (self.headers.get('If-None-Match') is None
+                    and self.headers.get('If-Modified-Since') == modified)):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return 304, 0
+        try:
+            body = read_body(rel_path, self.stats)
+        except OSError:
+            self.send_error(500)
+            return 500, 0
+        self.send_response(status)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', modified)
+        self.end_headers()
+        if head:
+            return status, 0
+        self.wfile.write(body)
+        return status, len(body)
+
+    def send_metrics(self, head):
+        body = METRICS.render()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if head:
+            return 200, 0
+        self.wfile.write(body)
+        return 200, len(body)
+
+    def log_request(self, code='-', size='-'):
+        pass  # Access lines go through ACCESS_LOG; errors still reach server.log
+
+def shutdown(signum, frame):
+    raise SystemExit(0)
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    signal.signal(signal.SIGTERM, shutdown)
+    httpd = SiteServer(('', port), RouteHandler)
+    ACCESS_LOG.start()
+    print(f"Serving {len(ROUTES)} routes on port {port}", flush=True)
+    try:
+        httpd.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        ACCESS_LOG.stop()
+"""
+
+    loadgen_py = """
+import os
+import sys
+import json
+import time
+import random
+import itertools
+import socket
+import asyncio
+import argparse
+import subprocess
+from urllib.parse import urlsplit
+
+ROUTES_FILE = 'routes.json'
+SERVER_MODES = {
+    'pysite': lambda port: [sys.executable, 'server.py', str(port)],
+    'http.server': lambda port: [sys.executable, '-m', 'http.server', str(port), '--directory', '.'],
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load-test the local site using URLs from routes.json.")
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help="Base URL of the server under test")
+    parser.add_argument('--server', choices=['none'] + list(SERVER_MODES), default='none',
+                        help="Start this server on the --url port for the run (default: use a running one)")
+    parser.add_argument('--pid', type=int, help="PID to sample CPU/RSS from (default: started server or .server_pid)")
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds to run")
+    parser.add_argument('--keep-alive', action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument('--conditional', type=float, default=0.0,
+                        help="Fraction of requests sent with If-Modified-Since from the manifest")
+    parser.add_argument('--page-weight', type=float, default=5.0)
+    parser.add_argument('--static-weight', type=float, default=3.0)
+    parser.add_argument('--redirect-weight', type=float, default=1.0)
+    parser.add_argument('--missing-weight', type=float, default=0.5, help="Weight of URLs that should 404")
+    parser.add_argument('--timeout', type=float, default=10.0)
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    return parser.parse_args()
+
+def load_url_mix(args):
+    # Build (urls, cum_weights) from the manifest: each route class shares its weight
+    # evenly, so adding pages does not skew the page/static ratio.
+    with open(ROUTES_FILE, encoding='utf-8') as f:
+        routes = json.load(f)['routes']
+    classes = {'page': [], 'static': [], 'redirect': [], 'missing': []}
+    for path, route in routes.items():
+        if 300 <= route[0] < 400:
+            classes['redirect'].append((path, None))
+        elif route[2].startswith('text/html'):
+            classes['page'].append((path, route[4]))
+        else:
+            classes['static'].append((path, route[4]))
+    classes['missing'] = [(f'/missing-{i}/', None) for i in range(10)]
+    weights = {'page': args.page_weight, 'static': args.static_weight,
+               'redirect': args.redirect_weight, 'missing': args.missing_weight}
+    urls, url_weights = [], []
+    for name, entries in classes.items():
+        if entries and weights[name] > 0:
+            urls += entries
+            url_weights += [weights[name] / len(entries)] * len(entries)
+    if not urls:
+        sys.exit("❌ No URLs to request. Check routes.json and the weights.")
+    # Cumulative weights are computed once; passing them to random.choices
+    # avoids an O(routes) re-accumulation on every request.
+    return urls, list(itertools.accumulate(url_weights))
+
+class ProcessSampler:
+    # Reads CPU time and RSS of the server process from /proc (Linux only).
+    def __init__(self, pid):
+        self.pid = pid
+        self.peak_rss = 0
+
+    def cpu_seconds(self):
+        try:
+            with open(f'/proc/{self.pid}/stat') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+        except (OSError, IndexError, ValueError):
+            return None
+
+    def rss_bytes(self):
+        try:
+            with open(f'/proc/{self.pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        return int(line.split()[1]) * 1024
+        except (OSError, ValueError):
+            pass
+        return None
+
+    async def watch(self):
+        while True:
+            rss = self.rss_bytes()
+            if rss:
+                self.peak_rss = max(self.peak_rss, rss)
+            await asyncio.sleep(0.25)
+
+class Results:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = {}
+        self.errors = {}
+        self.bytes = 0
+        self.connections = 0
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed')
+    version, status = status_line.split(None, 2)[:2]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\\r\\n', b'\\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    status = int(status)
+    keep_alive = headers.get('connection', '').lower() != 'close' and version == b'HTTP/1.1'
+    if status == 304 or 100 <= status < 200 or status == 204:
+        body = b''
+    elif 'content-length' in headers:
+        body = await reader.readexactly(int(headers['content-length']))
+    else:
+        body = await reader.read()
+        keep_alive = False
+    return status, len(body), keep_alive
+
+async def worker(host, port, args, urls, cum_weights, deadline, results):
+    reader = writer = None
+    connection = 'keep-alive' if args.keep_alive else 'close'
+    while time.perf_counter() < deadline:
+        path, modified = random.choices(urls, cum_weights=cum_weights)[0]
+        headers = f'GET {path} HTTP/1.1\\r\\nHost: {host}:{port}\\r\\nConnection: {connection}\\r\\n'
+        if modified and random.random() < args.conditional:
+            # If-Modified-Since works against both server modes (http.server ignores ETags)
+            headers += f'If-Modified-Since: {modified}\\r\\n'
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+                results.connections += 1
+            writer.write((headers + '\\r\\n').encode('latin-1'))
+            status, size, keep_alive = await asyncio.wait_for(read_response(reader), args.timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+            name = type(e).__name__
+            results.errors[name] = results.errors.get(name, 0) + 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            continue
+        results.latencies.append(time.perf_counter() - start)
+        results.statuses[status] = results.statuses.get(status, 0) + 1
+        results.bytes += size
+        if not (args.keep_alive and keep_alive):
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+def percentile(ordered, q):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+async def run(args, host, port, urls, cum_weights, sampler):
+    results = Results()
+    watcher = asyncio.create_task(sampler.watch()) if sampler else None
+    cpu_before = sampler.cpu_seconds() if sampler else None
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(worker(host, port, args, urls, cum_weights, deadline, results)
+                           for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    cpu_after = sampler.cpu_seconds() if sampler else None
+    if watcher:
+        watcher.cancel()
+    ordered = sorted(results.latencies)
+    report = {
+        'server': args.server,
+        'concurrency': args.concurrency,
+        'keep_alive': args.keep_alive,
+        'conditional': args.conditional,
+        'seconds': round(elapsed, 3),
+        'requests': len(ordered),
+        'rps': round(len(ordered) / elapsed, 1),
+        'connections': results.connections,
+        'bytes': results.bytes,
+        'statuses': {str(k): v for k, v in sorted(results.statuses.items())},
+        'errors': results.errors,
+        'latency_ms': {name: round(percentile(ordered, q) * 1000, 3)
+                       for name, q in (('p50', 50), ('p90', 90), ('p99', 99), ('p99.9', 99.9))},
+    }
+    report['latency_ms']['max'] = round(ordered[-1] * 1000, 3) if ordered else 0.0
+    if cpu_before is not None and cpu_after is not None:
+        report['server_cpu_percent'] = round((cpu_after - cpu_before) / elapsed * 100, 1)
+    if sampler and sampler.peak_rss:
+        report['server_peak_rss_mb'] = round(sampler.peak_rss / (1024 * 1024), 1)
+    return report
+
+def print_report(report):
+    print("---------------------------------------")
+    print(f"  Load Test: {report['server']} (c={report['concurrency']}, "
+          f"keep-alive={'on' if report['keep_alive'] else 'off'}, conditional={report['conditional']:.0%})")
+    print("---------------------------------------")
+    print(f"Requests:    {report['requests']} in {report['seconds']}s over {report['connections']} connections")
+    print(f"Throughput:  {report['rps']} req/s, {report['bytes'] / report['seconds'] / 1024:.1f} KiB/s")
+    print("Latency:     " + ", ".join(f"{k} {v}ms" for k, v in report['latency_ms'].items()))
+    print("Statuses:    " + (", ".join(f"{k}: {v}" for k, v in report['statuses'].items()) or "none"))
+    print("Errors:      " + (", ".join(f"{k}: {v}" for k, v in report['errors'].items()) or "none"))
+    if 'server_cpu_percent' in report:
+        print(f"Server CPU:  {report['server_cpu_percent']}%")
+    if 'server_peak_rss_mb' in report:
+        print(f"Server RSS:  {report['server_peak_rss_mb']} MiB peak")
+
+def port_in_use(host, port):
+    try:
+        with socket.create_connection((host, port), timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+def wait_for_port(host, port, proc, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            sys.exit(f"❌ Server exited with code {proc.returncode}.")
+        if port_in_use(host, port):
+            # Something answered; make sure it is our child and not a server it failed to displace
+            if proc.poll() is not None:
+                sys.exit(f"❌ Server exited with code {proc.returncode}.")
+            return
+        time.sleep(0.1)
+    proc.terminate()
+    sys.exit(f"❌ Server did not start listening on port {port}.")
+
+def main():
+    args = parse_args()
+    target = urlsplit(args.url)
+    host, port = target.hostname or '127.0.0.1', target.port or 80
+    urls, cum_weights = load_url_mix(args)
+
+    proc = None
+    pid = args.pid
+    if args.server != 'none':
+        if port_in_use(host, port):
+            sys.exit(f"❌ Port {port} is already in use; stop that server or pick another --url port.")
+        proc = subprocess.Popen(SERVER_MODES[args.server](port), stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL)
+        wait_for_port(host, port, proc)
+        pid = pid or proc.pid
+    elif pid is None and os.path.exists('.server_pid'):
+        with open('.server_pid') as f:
+            pid = int(f.read().strip())
+
+    sampler = ProcessSampler(pid) if pid and os.path.exists(f'/proc/{pid}') else None
+    try:
+        report = asyncio.run(run(args, host, port, urls, cum_weights, sampler))
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+if __name__ == "__main__":
+    main()
+"""
+
+    critical_css_py = """
+import os
+import re
+import hashlib
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+CSS_BUILD_DIR = os.path.join('static', 'css', 'build')
+CRITICAL_ELEMENTS = 60          # Body elements treated as above the fold
+CSS_SAFELIST = set()            # Classes/ids added at runtime by JS that must never be pruned
+PSEUDO = re.compile(r'(?<!\\\\)::?[\\w-]+(\\((?:[^()]|\\([^()]*\\))*\\))?')
+ATTR_SELECTOR = re.compile(r'\\[[^\\]]*\\]')
+SIMPLE = re.compile(r'([.#]?)((?:[\\w-]|\\\\.)+)')
+ESCAPE = re.compile(r'\\\\(.)')
+COMMENT = re.compile(r'/\\*.*?\\*/', re.S)
+STRUCTURE = re.compile(r'"(?:\\\\.|[^"\\\\])*"|\\'(?:\\\\.|[^\\'\\\\])*\\'|[{};]')
+CSS_URL = re.compile(r'(url\\(\\s*([\\'"]?))([^\\'")]+)(\\2\\s*\\))|(@import\\s+([\\'"]))([^\\'"]+)(\\6)', re.I)
+
+class UsageScanner(HTMLParser):
+    # Collects the tags, classes and ids a page uses, and separately those
+    # used in <head>, <header> and the first CRITICAL_ELEMENTS body elements.
+    # Also records the (start, end, attrs) of every <link> tag outside
+    # comments and scripts.
+    def __init__(self, html):
+        super().__init__()
+        self.used = set()
+        self.critical = set()
+        self.links = []
+        self.body_elements = 0
+        self.header_depth = 0
+        self.line_starts = [0] + [m.end() for m in re.finditer('\\n', html)]
+
+    def handle_starttag(self, tag, attrs):
+        tokens = {tag}
+        for name, value in attrs:
+            if name == 'class' and value:
+                tokens.update('.' + c for c in value.split())
+            elif name == 'id' and value:
+                tokens.add('#' + value)
+        self.used |= tokens
+        if tag == 'link':
+            line, col = self.getpos()
+            start = self.line_starts[line - 1] + col
+            self.links.append((start, start + len(self.get_starttag_text()), dict(attrs)))
+        if tag == 'header':
+            self.header_depth += 1
+        if self.body_elements <= CRITICAL_ELEMENTS or self.header_depth:
+            self.critical |= tokens
+        if tag == 'body' or self.body_elements:
+            self.body_elements += 1
+
+    def handle_endtag(self, tag):
+        if tag == 'header' and self.header_depth:
+            self.header_depth -= 1
+
+def absolutize_urls(text, href):
+    # Pruned sheets live in CSS_BUILD_DIR and critical rules are inlined into
+    # pages, so relative url()/@import targets are resolved against the source sheet.
+    def fix(match):
+        prefix, target, suffix = (match.group(1, 3, 4) if match.group(1) else match.group(5, 7, 8))
+        target = target.strip()
+        if target.startswith(('/', '#', 'data:')) or ':' in target.split('/', 1)[0]:
+            return match.group(0)
+        return prefix + urljoin(href, target) + suffix
+    return CSS_URL.sub(fix, text)
+
+def parse_css(text):
+    # Split a stylesheet into [prelude, body] pairs. Grouping at-rules
+    # (@media, @supports) get a list of nested rules as their body;
+    # statement at-rules (@import, @charset) have a body of None.
+    return _parse_block(COMMENT.sub('', text), 0)[0]
+
+def _find(text, pos, chars):
+    # Index of the next structural character in chars, skipping quoted strings
+    for match in STRUCTURE.finditer(text, pos):
+        if match.group(0) in chars:
+            return match.start()
+    return -1
+
+def _parse_block(text, pos):
+    rules = []
+    while pos < len(text):
+        i = _find(text, pos, '{};')
+        if i == -1:
+            break
+        if text[i] == '}':
+            return rules, i + 1
+        prelude = text[pos:i].strip()
+        if text[i] == ';':
+            if prelude.startswith('@'):
+                rules.append([prelude, None])
+            pos = i + 1
+        elif prelude.startswith(('@media', '@supports', '@layer', '@container')):
+            children, pos = _parse_block(text, i + 1)
+            rules.append([prelude, children])
+        else:
+            end = _matching_brace(text, i)
+            rules.append([prelude, text[i + 1:end].strip()])
+            pos = end + 1
+    return rules, len(text)
+
+def _matching_brace(text, brace):
+    depth = 0
+    i = brace
+    while i != -1:
+        depth += 1 if text[i] == '{' else -1
+        if depth == 0:
+            return i
+        i = _find(text, i + 1, '{}')
+    return len(text)
+
+def selector_tokens(selector):
+    # Tag/class/id tokens a selector needs; pseudo-classes and attribute
+    # selectors are ignored so the match errs on the side of keeping rules.
+    selector = ATTR_SELECTOR.sub(' ', PSEUDO.sub(' ', selector))
+    tokens = set()
+    for prefix, name in SIMPLE.findall(selector):
+        name = ESCAPE.sub(r'\\1', name)
+        tokens.add(prefix + (name if prefix else name.lower()))
+    return tokens
+
+def rule_matches(prelude, tokens):
+    return any(selector_tokens(s) <= tokens for s in prelude.split(','))
+
+def filter_rules(rules, tokens, keep_at_rules):
+    kept = []
+    for prelude, body in rules:
+        if isinstance(body, list):
+            children = filter_rules(body, tokens, keep_at_rules)
+            if children:
+                kept.append([prelude, children])
+        elif prelude.startswith('@'):
+            if keep_at_rules:
+                kept.append([prelude, body])
+        elif rule_matches(prelude, tokens):
+            kept.append([prelude, body])
+    return kept
+
+def serialize(rules):
+    out = []
+    for prelude, body in rules:
+        if body is None:
+            out.append(prelude + ';')
+        elif isinstance(body, list):
+            out.append(prelude + '{' + serialize(body) + '}')
+        else:
+            out.append(prelude + '{' + body + '}')
+    return ''.join(out)
+
+class CriticalCss:
+    # Prunes local stylesheets to what each page uses, inlines the
+    # above-the-fold subset and loads the pruned sheet asynchronously.
+    # Results are memoised per (stylesheets, used tokens, critical tokens),
+    # so pages sharing a layout and class set are processed once.
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.sheets = {}
+        self.results = {}
+        self.hits = 0
+
+    def load_sheet(self, href):
+        if href not in self.sheets:
+            path = os.path.join(self.output_dir, href.lstrip('/'))
+            try:
+                with open(path, encoding='utf-8') as f:
+                    self.sheets[href] = parse_css(absolutize_urls(f.read(), href))
+            except OSError:
+                self.sheets[href] = None
+        return self.sheets[href]
+
+    def process(self, html):
+        scanner = UsageScanner(html)
+        scanner.feed(html)
+        scanner.close()
+        links = []
+        for start, end, attrs in scanner.links:
+            href = attrs.get('href') or ''
+            if (attrs.get('rel') or '').lower() == 'stylesheet' and href.startswith('/') \\
+                    and not href.startswith('//') and self.load_sheet(href) is not None:
+                links.append((start, end, href))
+        if not links:
+            return html
+        safelist = {'.' + c for c in CSS_SAFELIST} | {'#' + c for c in CSS_SAFELIST}
+        used = frozenset(scanner.used | safelist)
+        critical = frozenset(scanner.critical | safelist)
+        # Only links separated by whitespace are merged, so anything in between
+        # (external sheets, <style> blocks) keeps its place in the cascade
+        runs = [[links[0]]]
+        for link in links[1:]:
+            if html[runs[-1][-1][1]:link[0]].strip():
+                runs.append([link])
+            else:
+                runs[-1].append(link)
+        parts, last = [], 0
+        for run in runs:
+            hrefs = tuple(href for _, _, href in run)
+            key = (hrefs, used, critical)
+            result = self.results.get(key)
+            if result is None:
+                result = self.results[key] = self.compute(hrefs, used, critical)
+            else:
+                self.hits += 1
+            critical_css, pruned_href = result
+            parts.append(html[last:run[0][0]])
+            parts.append(
+                f'<style>{critical_css}</style>\\n'
+                f'    <link rel="preload" href="{pruned_href}" as="style" '
+                f'onload="this.onload=null;this.rel=\\'stylesheet\\'">\\n'
+                f'    <noscript><link rel="stylesheet" href="{pruned_href}"></noscript>'
+            )
+            last = run[-1][1]
+        parts.append(html[last:])
+        return ''.join(parts)
+
+    def compute(self, hrefs, used, critical):
+        # @charset/@import/@namespace are ignored after any other rule, so when
+        # sheets are merged they move to the top (first @charset wins)
+        charset, head, rules = [], [], []
+        for href in hrefs:
+            for prelude, body in self.load_sheet(href):
+                keyword = prelude.split(None, 1)[0].lower() if body is None else None
+                if keyword == '@charset':
+                    charset = charset or [[prelude, body]]
+                elif keyword in ('@import', '@namespace'):
+                    head.append([prelude, body])
+                else:
+                    rules.append([prelude, body])
+        head.sort(key=lambda rule: rule[0].lower().startswith('@namespace'))
+        rules = charset + head + rules
+        pruned = serialize(filter_rules(rules, used, keep_at_rules=True))
+        critical_css = serialize(filter_rules(rules, critical, keep_at_rules=False))
+        # Name by content so different class sets with the same pruned output share a file
+        name = hashlib.sha1(pruned.encode('utf-8')).hexdigest()[:12] + '.css'
+        os.makedirs(os.path.join(self.output_dir, CSS_BUILD_DIR), exist_ok=True)
+        path = os.path.join(self.output_dir, CSS_BUILD_DIR, name)
+        if not os.path.exists(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(pruned)
+        return critical_css, '/' + CSS_BUILD_DIR.replace(os.sep, '/') + '/' + name
+"""
+
     build_py = """
 import os
+import json
+import shutil
+import mimetypes
+from email.utils import formatdate
 from jinja2 import Environment, FileSystemLoader
+from critical_css import CriticalCss, CSS_BUILD_DIR
 
 TEMPLATE_DIR = 'templates'
 OUTPUT_DIR = '.'
 PAGES_DIR = 'pages'
+STATIC_DIR = 'static'
+REDIRECTS_FILE = 'redirects.txt'
+ROUTES_FILE = 'routes.json'
+
+# Route entry for a file on disk: [status, file, content type, etag, last-modified].
+def file_route(rel_path):
+    st = os.stat(os.path.join(OUTPUT_DIR, rel_path))
+    ctype = mimetypes.guess_type(rel_path)[0] or 'application/octet-stream'
+    if ctype.startswith('text/') or ctype in ('application/javascript', 'application/json'):
+        ctype += '; charset=utf-8'
+    etag = '"%x-%x"' % (int(st.st_mtime), st.st_size)
+    return [200, rel_path.replace(os.sep, '/'), ctype, etag, formatdate(st.st_mtime, usegmt=True)]
+
+# Parse redirects.txt: one '<from> <to> [status]' per line, '#' for comments.
+def load_redirects():
+    redirects = {}
+    if not os.path.exists(REDIRECTS_FILE):
+        return redirects
+    with open(REDIRECTS_FILE, encoding='utf-8') as f:
+        for line in f:
+            parts = line.split('#', 1)[0].split()
+            if not parts:
+                continue
+            try:
+                status = int(parts[2]) if len(parts) == 3 else 301
+            except ValueError:
+                status = None
+            if len(parts) not in (2, 3) or status is None or not 300 <= status < 400:
+                print(f"⚠️  Skipping bad redirect: {line.strip()}")
+                continue
+            redirects[parts[0]] = [status, parts[1]]
+    return redirects
+
+# Precompute every servable URL so the server resolves a request with one dict lookup.
+def compile_routes(slugs):
+    routes = {'/': file_route('index.html'), '/index.html': file_route('index.html')}
+    for slug in slugs:
+        entry = file_route(os.path.join(slug, 'index.html'))
+        routes[f'/{slug}/'] = entry
+        routes[f'/{slug}/index.html'] = entry
+        # Trailing-slash normalization: /about -> /about/
+        routes[f'/{slug}'] = [301, f'/{slug}/']
+    if os.path.isdir(STATIC_DIR):
+        for root, _, files in os.walk(STATIC_DIR):
+            for name in files:
+                rel_path = os.path.relpath(os.path.join(root, name), OUTPUT_DIR)
+                routes['/' + rel_path.replace(os.sep, '/')] = file_route(rel_path)
+    # Explicit redirects win over generated routes
+    routes.update(load_redirects())
+    not_found = None
+    if os.path.exists(os.path.join(OUTPUT_DIR, '404.html')):
+        not_found = file_route('404.html')
+        not_found[0] = 404
+    with open(os.path.join(OUTPUT_DIR, ROUTES_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'routes': routes, 'not_found': not_found}, f, separators=(',', ':'))
+    print(f"✅ Compiled {len(routes)} routes: {ROUTES_FILE}")
 
 def build():
     env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
     print("🔨 Starting build...")
+    # Pruned stylesheets are regenerated every build; drop the previous set
+    shutil.rmtree(os.path.join(OUTPUT_DIR, CSS_BUILD_DIR), ignore_errors=True)
+    css = CriticalCss(OUTPUT_DIR)
     try:
         template = env.get_template('home.html')
         with open(os.path.join(OUTPUT_DIR, 'index.html'), 'w') as f:
-            f.write(template.render())
+            f.write(css.process(template.render()))
         print("✅ Generated: index.html")
     except Exception as e:
         print(f"❌ Home error: {e}")
 
+    try:
+        template = env.get_template('404.html')
+        with open(os.path.join(OUTPUT_DIR, '404.html'), 'w') as f:
+            f.write(css.process(template.render()))
+        print("✅ Generated: 404.html")
+    except Exception as e:
+        print(f"❌ 404 error: {e}")
+
+    slugs = []
     pages_path = os.path.join(TEMPLATE_DIR, PAGES_DIR)
     if os.path.exists(pages_path):
         for filename in os.listdir(pages_path):
@@ -308,9 +1268,13 @@ def build():
                 os.makedirs(page_dir, exist_ok=True)
                 template = env.get_template(os.path.join(PAGES_DIR, filename).replace('\\\\', '/'))
                 with open(os.path.join(page_dir, 'index.html'), 'w') as f:
-                    f.write(template.render(page_slug=slug))
+                    f.write(css.process(template.render(page_slug=slug)))
+                slugs.append(slug)
                 print(f"✅ Generated: {slug}/index.html")
 
+    print(f"✅ Critical CSS: {len(css.results)} unique stylesheet/class-set combinations, {css.hits} reused")
+    compile_routes(slugs)
+
 if __name__ == "__main__":
     build()
 """
@@ -319,14 +1283,19 @@ if __name__ == "__main__":
         'templates/base.html': base_html,
         'templates/home.html': home_html,
         'templates/pages/about.html': about_html,
+        'templates/404.html': not_found_html,
         'templates/components/header.html': header_html,
         'templates/components/nav.html': nav_html,
         'templates/components/hero.html': hero_html,
         'templates/components/footer.html': footer_html,
         'static/css/theme.css': theme_css,
         'requirements.txt': requirements_txt,
+        'redirects.txt': redirects_txt,
         'setup_env.sh': setup_env_sh,
         'manage.sh': manage_sh,
+        'server.py': server_py,
+        'loadgen.py': loadgen_py,
+        'critical_css.py': critical_css_py,
         'build.py': build_py
     }
 
@@ -334,6 +1303,7 @@ if __name__ == "__main__":
         create_file(os.path.join(base_dir, path), content)
 
     print("\n✅ Setup complete! Run 'bash setup_env.sh' then 'bash manage.sh'.")
+    print("   Benchmark with: python3 loadgen.py --server pysite --url http://127.0.0.1:8000")
 
 if __name__ == "__main__":
     main()